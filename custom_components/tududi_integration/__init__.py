@@ -1,16 +1,32 @@
 """Tududi HACS integration for Home Assistant."""
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 from pathlib import Path
+from urllib.parse import urlparse
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, CONF_URL, CONF_TITLE, CONF_ICON
+from .const import (
+    DOMAIN,
+    CONF_URL,
+    CONF_TITLE,
+    CONF_ICON,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_KEEP_WARM,
+    DEFAULT_KEEP_WARM,
+    PANEL_STATIC_URL,
+    FRONTEND_STATIC_URL,
+    PANEL_ELEMENT_NAME,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,9 +35,29 @@ PLATFORMS: list[str] = ["sensor"]
 # Config schema - this integration can only be set up via config entries
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
+SERVICE_PROFILE = "profile"
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("duration", default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Tududi HACS component."""
+
+    async def async_handle_profile(call: ServiceCall) -> None:
+        """Start profiling the integration for the requested duration."""
+        # Imported on demand so profiling costs nothing until it is used
+        from .profiler import async_start_profile
+
+        async_start_profile(hass, call.data["duration"])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA
+    )
     return True
 
 
@@ -35,8 +71,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Register the frontend panel
     await async_register_panel(hass, entry)
     
-    # Set up sensor platform
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Set up sensor platform. Without credentials the entry is panel-only and
+    # the sensor platform (and its API client) is never loaded.
+    if has_credentials(entry):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        hass.data.setdefault(DOMAIN + "_platforms", {})[entry.entry_id] = PLATFORMS
+    else:
+        _LOGGER.debug(
+            "No credentials configured for %s, running in panel-only mode",
+            entry.data.get(CONF_TITLE, "Tududi"),
+        )
     
     # Set up options update listener
     entry.async_on_unload(entry.add_update_listener(async_update_options))
@@ -44,16 +88,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+def has_credentials(entry: ConfigEntry) -> bool:
+    """Return True if the entry has credentials for the Tududi API."""
+    return bool(entry.data.get(CONF_USERNAME) and entry.data.get(CONF_PASSWORD))
+
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update options."""
+    internal_updates = hass.data.get(DOMAIN + "_internal_updates", set())
+    if entry.entry_id in internal_updates:
+        # Capabilities saved by the running coordinator, nothing to apply
+        internal_updates.discard(entry.entry_id)
+        return
+
     # Reload the config entry to apply new settings
     await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Unload sensor platform
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    # Unload sensor platform, if it was set up. Entry data may already hold
+    # new credentials here, so check what was actually loaded.
+    platforms = hass.data.get(DOMAIN + "_platforms", {}).pop(entry.entry_id, [])
+    unload_ok = True
+    if platforms:
+        unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
+        hass.data.get(DOMAIN + "_coordinators", {}).pop(entry.entry_id, None)
     
     # Remove the panel
     await async_unregister_panel(hass, entry)
@@ -101,18 +161,43 @@ async def async_unregister_panel(hass: HomeAssistant, entry: ConfigEntry) -> Non
     await hass.async_add_executor_job(remove_panel_file)
 
 
+async def async_register_static_path(hass: HomeAssistant, url_path: str, path: str) -> None:
+    """Serve a directory with long-lived cache headers, once per run."""
+    registered = hass.data.setdefault(DOMAIN + "_static", set())
+    if url_path in registered:
+        return
+    try:
+        from homeassistant.components.http import StaticPathConfig
+    except ImportError:
+        # Home Assistant before 2024.6
+        hass.http.register_static_path(url_path, path, cache_headers=True)
+    else:
+        await hass.http.async_register_static_paths([StaticPathConfig(url_path, path, True)])
+    registered.add(url_path)
+
+
+def content_hash(content: str) -> str:
+    """Return a short hash used to bust the browser cache."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+
+
 async def async_register_panel(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Register the Tududi panel."""
     url = entry.data[CONF_URL]
     title = entry.data.get(CONF_TITLE, "Tududi")
     icon = entry.data.get(CONF_ICON, "mdi:clipboard-text")
+    keep_warm = entry.data.get(CONF_KEEP_WARM, DEFAULT_KEEP_WARM)
+    origin = "{0.scheme}://{0.netloc}".format(urlparse(url))
     
-    # Create the HTML content with the configured URL
+    # Create the HTML content with the configured URL. The connection hints
+    # let the browser open the connection to Tududi while the page loads.
     panel_html_content = f"""<!DOCTYPE html>
 <html>
   <head>
     <title>{title} HA Panel</title>
     <meta charset="UTF-8" />
+    <link rel="preconnect" href="{origin}" crossorigin />
+    <link rel="dns-prefetch" href="{origin}" />
   </head>
   <body style="margin:0;padding:0;height:100vh;width:100vw;overflow:hidden">
     <iframe src="{url}" width="100%" height="100%" style="border:none;"></iframe>
@@ -122,19 +207,26 @@ async def async_register_panel(hass: HomeAssistant, entry: ConfigEntry) -> None:
     # Ensure the www directory exists
     www_dir = Path(hass.config.path("www"))
     panel_dir = www_dir / "tududi_hacs"
+    frontend_dir = Path(__file__).parent / "frontend"
     
-    def create_panel_files():
-        """Create panel directory and file synchronously."""
+    def create_panel_files() -> str:
+        """Create panel directory and file synchronously, return the module hash."""
         panel_dir.mkdir(parents=True, exist_ok=True)
         panel_file = panel_dir / f"panel_{entry.entry_id}.html"
         with open(panel_file, "w", encoding="utf-8") as f:
             f.write(panel_html_content)
+        return content_hash((frontend_dir / "tududi-panel.js").read_text(encoding="utf-8"))
     
-    await hass.async_add_executor_job(create_panel_files)
+    module_hash = await hass.async_add_executor_job(create_panel_files)
+    await async_register_static_path(hass, PANEL_STATIC_URL, str(panel_dir))
+    await async_register_static_path(hass, FRONTEND_STATIC_URL, str(frontend_dir))
     
     # Create panel configuration
     panel_name = f"tududi_{entry.entry_id}"
-    panel_url = f"/local/tududi_hacs/panel_{entry.entry_id}.html"
+    panel_url = (
+        f"{PANEL_STATIC_URL}/panel_{entry.entry_id}.html"
+        f"?v={content_hash(panel_html_content)}"
+    )
     
     # Store panel configuration
     hass.data.setdefault(DOMAIN + "_panels", {})[entry.entry_id] = {
@@ -146,19 +238,36 @@ async def async_register_panel(hass: HomeAssistant, entry: ConfigEntry) -> None:
     
     # Automatically register the panel using Home Assistant's frontend API
     try:
-        # Import and use frontend component properly
-        from homeassistant.components import frontend
-        
-        # Register the panel asynchronously
-        frontend.async_register_built_in_panel(
-            hass,
-            component_name="iframe",
-            sidebar_title=title,
-            sidebar_icon=icon,
-            frontend_url_path=panel_name,
-            config={"url": panel_url, "title": title},
-            require_admin=False,
-        )
+        if keep_warm:
+            # Custom panel that keeps the Tududi iframe loaded across panel
+            # switches, so Tududi doesn't cold start on every visit
+            from homeassistant.components import panel_custom
+            
+            await panel_custom.async_register_panel(
+                hass,
+                frontend_url_path=panel_name,
+                webcomponent_name=PANEL_ELEMENT_NAME,
+                sidebar_title=title,
+                sidebar_icon=icon,
+                module_url=f"{FRONTEND_STATIC_URL}/tududi-panel.js?v={module_hash}",
+                embed_iframe=False,
+                config={"url": url, "title": title},
+                require_admin=False,
+            )
+        else:
+            # Import and use frontend component properly
+            from homeassistant.components import frontend
+            
+            # Register the panel asynchronously
+            frontend.async_register_built_in_panel(
+                hass,
+                component_name="iframe",
+                sidebar_title=title,
+                sidebar_icon=icon,
+                frontend_url_path=panel_name,
+                config={"url": panel_url, "title": title},
+                require_admin=False,
+            )
         _LOGGER.info("Successfully registered Tududi panel: %s", title)
     except Exception as e:
         _LOGGER.error("Failed to register panel automatically: %s", e)
@@ -0,0 +1,589 @@
+"""API client for the Tududi integration."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import zlib
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import async_timeout
+
+from .const import (
+    CAPABILITY_API_VERSION,
+    CAPABILITY_COMPRESSION,
+    CAPABILITY_CONDITIONAL,
+    CAPABILITY_FILTERS,
+    CAPABILITY_LATENCY,
+    CAPABILITY_PAGINATION,
+    PAGINATION_CURSOR,
+    PAGINATION_NONE,
+    PAGINATION_OFFSET,
+    PROBE_TIMEOUT,
+    SENSOR_TIMEOUT,
+    TASK_DETAIL_PATH,
+    TASKS_PAGE_CONCURRENCY,
+    TASKS_PAGE_RETRIES,
+    TASKS_PAGE_RETRY_DELAY,
+    TASKS_PAGE_SIZE,
+)
+from .query import TaskQueryPlan, async_detect_filter_support
+
+_LOGGER = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+BROTLI_AVAILABLE = brotli is not None
+
+JsonDecoder = Callable[[bytes], Any]
+
+
+def default_json_decoder() -> JsonDecoder:
+    """Return the fastest available JSON decoder."""
+    if orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+class TududiApiError(Exception):
+    """Error to indicate a failed Tududi API request."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        """Initialize the error with the HTTP status, if any."""
+        super().__init__(message)
+        self.status = status
+
+
+class TududiAuthError(TududiApiError):
+    """Error to indicate Tududi rejected our credentials."""
+
+
+class TududiConnectionError(TududiApiError):
+    """Error to indicate the Tududi server could not be reached."""
+
+
+def decompress_body(raw: bytes, encoding: str) -> bytes:
+    """Decompress a response body according to its Content-Encoding."""
+    encoding = encoding.lower()
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(raw)
+            except zlib.error:
+                # Raw deflate stream without the zlib header
+                return zlib.decompress(raw, -zlib.MAX_WBITS)
+        if encoding == "br" and brotli is not None:
+            return brotli.decompress(raw)
+    except Exception as err:  # zlib.error or the brotli module's error
+        raise TududiApiError(f"Could not decompress {encoding} response: {err}") from err
+    return raw
+
+
+class TududiApiClient:
+    """Thin client for the Tududi REST API."""
+
+    def __init__(
+        self,
+        base_url: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        decoder: Optional[JsonDecoder] = None,
+    ) -> None:
+        """Initialize the client."""
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self._decoder = decoder or default_json_decoder()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._closed = False
+        # Size information about the last tasks request
+        self.last_fetch_stats: Dict[str, Any] = {}
+        # Pagination style of the server, None until detected
+        self.pagination_mode: Optional[str] = None
+
+    @property
+    def has_credentials(self) -> bool:
+        """Return True if username and password are configured."""
+        return bool(self.username and self.password)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create or reuse the client session."""
+        if self._closed:
+            # Don't open a new session that nothing would close
+            raise TududiConnectionError("The Tududi client is closed")
+        if not self._session or self._session.closed:
+            connector = aiohttp.TCPConnector(force_close=True, enable_cleanup_closed=True)
+            # Responses are decompressed by us so the wire size can be measured
+            self._session = aiohttp.ClientSession(
+                connector=connector, auto_decompress=False
+            )
+        return self._session
+
+    async def async_close(self) -> None:
+        """Close the underlying session and refuse further requests."""
+        self._closed = True
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def authenticate(self) -> bool:
+        """Authenticate with Tududi server.
+
+        Returns False if Tududi rejected the credentials and raises
+        TududiConnectionError if the login request itself failed.
+        """
+        if not self.has_credentials:
+            _LOGGER.debug("No credentials provided, trying without authentication")
+            return True
+
+        try:
+            # Login to Tududi - based on the actual API endpoints
+            login_url = f"{self.base_url}/api/login"
+            login_data = {
+                "email": self.username,
+                "password": self.password,
+            }
+
+            headers = {
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            }
+
+            async with async_timeout.timeout(SENSOR_TIMEOUT):
+                async with self._get_session().post(
+                    login_url, json=login_data, headers=headers
+                ) as response:
+                    if response.status == 200:
+                        _LOGGER.debug("Successfully authenticated with Tududi")
+                        # Session cookies should be automatically stored in the session
+                        return True
+                    else:
+                        response_text = await self._response_text(response)
+                        _LOGGER.error(
+                            "Failed to authenticate with Tududi: %s - %s",
+                            response.status, response_text
+                        )
+                        return False
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            _LOGGER.error("Authentication error: %s", exception)
+            raise TududiConnectionError(
+                f"Cannot reach {self.base_url}/api/login: {exception}"
+            ) from exception
+
+    def _request_headers(self) -> Dict[str, str]:
+        """Return the headers used for API requests."""
+        encodings = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+        return {
+            "Accept": "application/json",
+            "Accept-Encoding": encodings,
+            "X-Requested-With": "XMLHttpRequest",
+        }
+
+    @staticmethod
+    async def _response_text(response: aiohttp.ClientResponse) -> str:
+        """Return the decompressed body of a response as text."""
+        raw = await response.read()
+        try:
+            body = decompress_body(raw, response.headers.get("Content-Encoding", "identity"))
+        except TududiApiError:
+            body = raw
+        return body.decode(response.charset or "utf-8", errors="replace")
+
+    async def _decode_response(
+        self, response: aiohttp.ClientResponse
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Read and decode a JSON response, returning it with its size stats."""
+        # The session doesn't decompress, so this is the size on the wire
+        raw = await response.read()
+        encoding = response.headers.get("Content-Encoding", "identity")
+        body = decompress_body(raw, encoding)
+        stats = {
+            "content_encoding": encoding,
+            "compressed_bytes": len(raw),
+            "decoded_bytes": len(body),
+            # Validators for conditional requests
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return self._decoder(body), stats
+
+    async def async_get_json(self, path: str, params: Optional[Dict[str, str]] = None) -> Any:
+        """GET an API path, re-authenticating once on 401."""
+        data, _stats = await self._async_get_json_with_stats(path, params)
+        return data
+
+    async def _async_get_json_with_stats(
+        self, path: str, params: Optional[Dict[str, str]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """GET an API path, returning the data and its size stats."""
+        url = f"{self.base_url}{path}"
+        headers = self._request_headers()
+        session = self._get_session()
+
+        async with session.get(url, headers=headers, params=params) as response:
+            if response.status == 200:
+                return await self._decode_response(response)
+            if response.status != 401:
+                response_text = await self._response_text(response)
+                raise TududiApiError(
+                    f"API request failed: {response.status} - {response_text}", response.status
+                )
+
+        # Session expired, try to re-authenticate
+        if not await self.authenticate():
+            raise TududiAuthError("Authentication failed")
+
+        async with session.get(url, headers=headers, params=params) as retry_response:
+            if retry_response.status == 200:
+                return await self._decode_response(retry_response)
+            response_text = await self._response_text(retry_response)
+            raise TududiApiError(
+                f"API request failed: {retry_response.status} - {response_text}",
+                retry_response.status,
+            )
+
+    async def async_get_tasks(self, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Fetch the task list, optionally filtered by query parameters."""
+        data, self.last_fetch_stats = await self._async_get_tasks_with_stats(params)
+        return data
+
+    async def _async_get_tasks_with_stats(
+        self, params: Optional[Dict[str, str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Fetch the task list, returning it with its size stats."""
+        data, stats = await self._async_get_json_with_stats("/api/tasks", params)
+        _LOGGER.debug(
+            "Fetched tasks: %s bytes on the wire (%s), %d bytes decoded",
+            stats.get("compressed_bytes"),
+            stats.get("content_encoding"),
+            stats.get("decoded_bytes", 0),
+        )
+        return data, stats
+
+    async def async_get_conditional(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Tuple[int, Dict[str, str], Any]:
+        """GET an API path with conditional request headers.
+
+        Returns the status, the response headers and the decoded body, which
+        is None when the server answered 304 Not Modified. Re-authenticates
+        once on 401.
+        """
+        headers = self._request_headers()
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(2):
+            async with self._get_session().get(url, headers=headers, params=params) as response:
+                if response.status == 304:
+                    return response.status, dict(response.headers), None
+                if response.status == 200:
+                    data, self.last_fetch_stats = await self._decode_response(response)
+                    return response.status, dict(response.headers), data
+                if response.status != 401 or attempt:
+                    response_text = await self._response_text(response)
+                    raise TududiApiError(
+                        f"API request failed: {response.status} - {response_text}", response.status
+                    )
+
+            # Session expired, try to re-authenticate
+            if not await self.authenticate():
+                raise TududiAuthError("Authentication failed")
+
+        raise TududiApiError("No attempts made")
+
+    async def async_get_task(self, task_id: Any) -> Dict[str, Any]:
+        """Fetch the full details of a single task."""
+        async with async_timeout.timeout(SENSOR_TIMEOUT):
+            data = await self.async_get_json(TASK_DETAIL_PATH.format(task_id=task_id))
+        # Some versions wrap the task in an object
+        if isinstance(data, dict) and isinstance(data.get("task"), dict):
+            return data["task"]
+        return data
+
+    async def async_get_version(self) -> Optional[str]:
+        """Return the Tududi server version, if the server reports it."""
+        try:
+            data = await self.async_get_json("/api/version")
+        except (TududiApiError, ValueError):
+            # Not supported, or answered by something else such as the web
+            # app's HTML fallback
+            return None
+        if isinstance(data, dict):
+            return data.get("version")
+        return None
+
+    async def async_probe(self) -> Dict[str, Any]:
+        """Check that the server is reachable and detect its capabilities.
+
+        Raises TududiConnectionError if the server can't be reached, and
+        TududiAuthError if the configured credentials are rejected. Detecting
+        the capabilities is best effort: whatever was detected when it fails
+        or PROBE_TIMEOUT runs out is returned, the rest is left to runtime.
+        """
+        start = time.monotonic()
+        try:
+            async with async_timeout.timeout(SENSOR_TIMEOUT):
+                async with self._get_session().get(self.base_url) as response:
+                    await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise TududiConnectionError(f"Cannot reach {self.base_url}: {err}") from err
+
+        capabilities: Dict[str, Any] = {
+            CAPABILITY_LATENCY: round((time.monotonic() - start) * 1000),
+        }
+        if not self.has_credentials:
+            # Panel-only entry, nothing else to detect
+            return capabilities
+
+        if not await self.authenticate():
+            raise TududiAuthError("Authentication failed")
+
+        try:
+            async with async_timeout.timeout(PROBE_TIMEOUT):
+                await self._async_detect_capabilities(capabilities)
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "Detecting the capabilities of %s timed out, the rest is "
+                "detected at runtime", self.base_url
+            )
+        except (TududiApiError, aiohttp.ClientError, ValueError) as err:
+            _LOGGER.warning(
+                "Could not detect all capabilities of %s, the rest is detected "
+                "at runtime: %s", self.base_url, err
+            )
+
+        _LOGGER.debug("Detected Tududi capabilities: %s", capabilities)
+        return capabilities
+
+    async def _async_detect_capabilities(self, capabilities: Dict[str, Any]) -> None:
+        """Detect server capabilities, adding each to capabilities as found."""
+        async with async_timeout.timeout(SENSOR_TIMEOUT):
+            capabilities[CAPABILITY_API_VERSION] = await self.async_get_version()
+
+            # A single-task request is enough to check the validators
+            probe_params = {"limit": "1"}
+            _status, headers, _data = await self.async_get_conditional(
+                "/api/tasks", probe_params
+            )
+            etag = headers.get("ETag")
+            last_modified = headers.get("Last-Modified")
+            conditional = False
+            if etag or last_modified:
+                status, _headers, _data = await self.async_get_conditional(
+                    "/api/tasks", probe_params, etag, last_modified
+                )
+                conditional = status == 304
+            capabilities[CAPABILITY_CONDITIONAL] = conditional
+
+        # Servers and proxies often skip compressing tiny bodies, so check
+        # the encoding on the full task list
+        baseline = await self.async_get_tasks_paged()
+        capabilities[CAPABILITY_PAGINATION] = self.pagination_mode
+        capabilities[CAPABILITY_COMPRESSION] = self.last_fetch_stats.get(
+            "content_encoding", "identity"
+        )
+
+        # One filter at a time, so a timeout keeps the ones already detected
+        filters = capabilities[CAPABILITY_FILTERS] = {}
+        plan = TaskQueryPlan(due_from=date.today())
+        for name in plan.active_filters():
+            filters.update(
+                await async_detect_filter_support(
+                    self, plan, baseline.get("tasks", []), (name,)
+                )
+            )
+
+    async def _async_get_page(
+        self, params: Dict[str, str], retries: int
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Fetch a single page of tasks, retrying it on transient failures.
+
+        Timeouts, connection errors and server errors are retried, anything
+        else (e.g. a 400 for an unsupported parameter) fails right away.
+        """
+        for attempt in range(retries + 1):
+            try:
+                async with async_timeout.timeout(SENSOR_TIMEOUT):
+                    return await self._async_get_tasks_with_stats(params)
+            except Exception as err:  # pylint: disable=broad-except
+                if attempt >= retries or not _is_transient(err):
+                    raise
+                _LOGGER.debug(
+                    "Retrying Tududi tasks page %s after error: %s", params, err
+                )
+                await asyncio.sleep(TASKS_PAGE_RETRY_DELAY * (attempt + 1))
+        raise TududiApiError("No attempts made")
+
+    async def async_get_tasks_paged(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        page_size: int = TASKS_PAGE_SIZE,
+        concurrency: int = TASKS_PAGE_CONCURRENCY,
+        retries: int = TASKS_PAGE_RETRIES,
+    ) -> Dict[str, Any]:
+        """Fetch the task list page by page when the server supports it.
+
+        Offset pages are requested concurrently once the total is known,
+        cursor pages sequentially. A failing page is retried on its own.
+        Servers without pagination get a single request.
+        """
+        params = dict(params or {})
+        if self.pagination_mode == PAGINATION_NONE:
+            data, self.last_fetch_stats = await self._async_get_page(params, retries)
+            return data
+
+        first, first_stats = await self._async_get_page(
+            {**params, "limit": str(page_size), "offset": "0"}, retries
+        )
+        first_tasks = first.get("tasks", [])
+        if len(first_tasks) > page_size:
+            # Limit was ignored, the first response already holds everything
+            self.pagination_mode = PAGINATION_NONE
+            self.last_fetch_stats = first_stats
+            return first
+
+        # Tasks indexed by id, merged as pages arrive
+        index: Dict[Any, Dict[str, Any]] = {}
+        pages: Dict[int, List[Dict[str, Any]]] = {0: first_tasks}
+        stats = [first_stats]
+
+        def merge(page_number: int, tasks: List[Dict[str, Any]]) -> int:
+            """Merge a page into the index, returning the number of new tasks."""
+            pages[page_number] = tasks
+            added = 0
+            for task in tasks:
+                task_id = task.get("id")
+                if task_id not in index:
+                    index[task_id] = task
+                    added += 1
+            return added
+
+        merge(0, first_tasks)
+        cursor = _next_cursor(first)
+        total = _total_count(first)
+
+        if cursor is not None:
+            self.pagination_mode = PAGINATION_CURSOR
+            page_number = 0
+            while cursor is not None:
+                page_number += 1
+                page, page_stats = await self._async_get_page(
+                    {**params, "limit": str(page_size), "cursor": str(cursor)}, retries
+                )
+                stats.append(page_stats)
+                if not merge(page_number, page.get("tasks", [])):
+                    break
+                cursor = _next_cursor(page)
+
+        elif total is not None and total > len(first_tasks):
+            self.pagination_mode = PAGINATION_OFFSET
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch_offset(page_number: int) -> Tuple[int, Dict[str, Any], Dict[str, Any]]:
+                async with semaphore:
+                    page, page_stats = await self._async_get_page(
+                        {**params, "limit": str(page_size), "offset": str(page_number * page_size)},
+                        retries,
+                    )
+                return page_number, page, page_stats
+
+            requests = [
+                asyncio.ensure_future(fetch_offset(page_number))
+                for page_number in range(1, -(-total // page_size))
+            ]
+            try:
+                for next_page in asyncio.as_completed(requests):
+                    page_number, page, page_stats = await next_page
+                    stats.append(page_stats)
+                    merge(page_number, page.get("tasks", []))
+            finally:
+                # A page that failed all its retries fails the fetch
+                for request in requests:
+                    request.cancel()
+
+        elif len(first_tasks) == page_size:
+            # No total or cursor, walk offsets until a short page
+            page_number = 0
+            while True:
+                page_number += 1
+                page, page_stats = await self._async_get_page(
+                    {**params, "limit": str(page_size), "offset": str(page_number * page_size)},
+                    retries,
+                )
+                stats.append(page_stats)
+                tasks = page.get("tasks", [])
+                if tasks and not merge(page_number, tasks):
+                    # Offset was ignored, the pages we have are incomplete
+                    _LOGGER.debug("Tududi ignores the offset parameter, fetching unpaged")
+                    self.pagination_mode = PAGINATION_NONE
+                    data, self.last_fetch_stats = await self._async_get_page(params, retries)
+                    return data
+                if len(tasks) < page_size:
+                    break
+            self.pagination_mode = PAGINATION_OFFSET
+
+        self.last_fetch_stats = first_stats
+        if len(pages) > 1:
+            self.last_fetch_stats = {
+                "content_encoding": first_stats.get("content_encoding"),
+                "compressed_bytes": sum(s.get("compressed_bytes", 0) for s in stats),
+                "decoded_bytes": sum(s.get("decoded_bytes", 0) for s in stats),
+                "pages": len(pages),
+            }
+
+        # Keep the server order, pages may have completed out of order
+        ordered: List[Dict[str, Any]] = []
+        for page_number in sorted(pages):
+            for task in pages[page_number]:
+                if index.get(task.get("id")) is task:
+                    ordered.append(task)
+
+        data = dict(first)
+        data["tasks"] = ordered
+        return data
+
+
+def _is_transient(err: Exception) -> bool:
+    """Return True if a failed request is worth retrying."""
+    if isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError, TududiConnectionError)):
+        return True
+    return isinstance(err, TududiApiError) and err.status is not None and err.status >= 500
+
+
+def _next_cursor(data: Dict[str, Any]) -> Optional[Any]:
+    """Return the cursor of the next page, if any."""
+    pagination = data.get("pagination") or {}
+    return data.get("next_cursor") or pagination.get("next_cursor")
+
+
+def _total_count(data: Dict[str, Any]) -> Optional[int]:
+    """Return the total number of tasks reported by the server, if any."""
+    pagination = data.get("pagination") or {}
+    total = data.get("total", pagination.get("total"))
+    try:
+        return int(total) if total is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,50 @@
+"""Task detail cache for the Tududi integration."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .const import TASK_DETAIL_CACHE_SIZE
+
+
+class TaskDetailCache:
+    """Size-bounded LRU cache of full task details.
+
+    Entries are keyed by task id and only returned while the task's
+    updated_at matches the value they were stored with.
+    """
+
+    def __init__(self, max_size: int = TASK_DETAIL_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self._entries: OrderedDict[Any, Tuple[Any, Dict[str, Any]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached tasks."""
+        return len(self._entries)
+
+    def get(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached details for a task if they are still current."""
+        task_id = task.get("id")
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        updated_at, detail = entry
+        if updated_at != task.get("updated_at"):
+            # The task changed since we fetched it
+            del self._entries[task_id]
+            return None
+        self._entries.move_to_end(task_id)
+        return detail
+
+    def put(self, task: Dict[str, Any], detail: Dict[str, Any]) -> None:
+        """Store the details for a task, evicting the least recently used."""
+        task_id = task.get("id")
+        self._entries[task_id] = (task.get("updated_at"), detail)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached details."""
+        self._entries.clear()
@@ -13,7 +13,20 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, CONF_URL, CONF_TITLE, CONF_ICON, CONF_USERNAME, CONF_PASSWORD
+from .api import TududiApiClient, TududiApiError, TududiAuthError
+from .const import (
+    DOMAIN,
+    CONF_URL,
+    CONF_TITLE,
+    CONF_ICON,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_CAPABILITIES,
+    CONF_KEEP_WARM,
+    CONF_EXECUTOR_THRESHOLD,
+    DEFAULT_KEEP_WARM,
+    PROCESSING_EXECUTOR_THRESHOLD,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +37,7 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_ICON, default="mdi:clipboard-text"): cv.string,
         vol.Optional(CONF_USERNAME): cv.string,
         vol.Optional(CONF_PASSWORD): cv.string,
+        vol.Optional(CONF_KEEP_WARM, default=DEFAULT_KEEP_WARM): cv.boolean,
     }
 )
 
@@ -54,12 +68,30 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     if not validate_url(url):
         raise InvalidURL
     
+    # Probe the server once so broken URLs and credentials are reported here,
+    # and the runtime client can start from the detected capabilities
+    client = TududiApiClient(url, data.get(CONF_USERNAME), data.get(CONF_PASSWORD))
+    try:
+        capabilities = await client.async_probe()
+    except TududiAuthError as err:
+        raise InvalidAuth from err
+    except TududiApiError as err:
+        if client.has_credentials:
+            raise CannotConnect from err
+        # Panel-only entries are loaded by the browser, which may reach
+        # servers Home Assistant itself can't
+        _LOGGER.debug("Could not probe %s for a panel-only entry: %s", url, err)
+        capabilities = {}
+    finally:
+        await client.async_close()
+    
     # Return info that you want to store in the config entry.
     return {
         "title": f"Tududi Panel - {data[CONF_TITLE]}",
         "url": url,
         "panel_title": data[CONF_TITLE],
         "panel_icon": data[CONF_ICON],
+        "capabilities": capabilities,
     }
 
 
@@ -79,6 +111,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
             except InvalidURL:
                 errors[CONF_URL] = "invalid_url"
             except Exception:  # pylint: disable=broad-except
@@ -89,7 +123,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(user_input[CONF_URL])
                 self._abort_if_unique_id_configured()
                 
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"],
+                    data={**user_input, CONF_CAPABILITIES: info["capabilities"]},
+                )
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
@@ -112,7 +149,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         if user_input is not None:
             try:
-                await validate_input(self.hass, user_input)
+                info = await validate_input(self.hass, user_input)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
             except InvalidURL:
                 errors[CONF_URL] = "invalid_url"
             except Exception:  # pylint: disable=broad-except
@@ -121,7 +162,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             else:
                 # Update the config entry data
                 self.hass.config_entries.async_update_entry(
-                    self.config_entry, data=user_input
+                    self.config_entry,
+                    data={**user_input, CONF_CAPABILITIES: info["capabilities"]},
                 )
                 return self.async_create_entry(title="", data=user_input)
 
@@ -142,6 +184,16 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(
                     CONF_PASSWORD, default=current_data.get(CONF_PASSWORD, "")
                 ): cv.string,
+                vol.Optional(
+                    CONF_KEEP_WARM,
+                    default=current_data.get(CONF_KEEP_WARM, DEFAULT_KEEP_WARM),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_EXECUTOR_THRESHOLD,
+                    default=current_data.get(
+                        CONF_EXECUTOR_THRESHOLD, PROCESSING_EXECUTOR_THRESHOLD
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
             }
         )
 
@@ -154,5 +206,9 @@ class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
 
+class InvalidAuth(HomeAssistantError):
+    """Error to indicate the credentials were rejected."""
+
+
 class InvalidURL(HomeAssistantError):
     """Error to indicate the URL is invalid."""
@@ -8,11 +8,90 @@ CONF_TITLE = "title"
 CONF_ICON = "icon"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
+CONF_KEEP_WARM = "keep_warm"
+CONF_EXECUTOR_THRESHOLD = "executor_threshold"
 
 # Defaults
 DEFAULT_TITLE = "Tududi"
 DEFAULT_ICON = "mdi:clipboard-text"
+DEFAULT_KEEP_WARM = False
+
+# Panel files are served from these paths with long-lived cache headers,
+# URLs carry a content hash so changes still reach the browser
+PANEL_STATIC_URL = f"/{DOMAIN}/panels"
+FRONTEND_STATIC_URL = f"/{DOMAIN}/frontend"
+PANEL_ELEMENT_NAME = "tududi-warm-panel"
 
 # Sensor constants
 SENSOR_UPDATE_INTERVAL = 300  # 5 minutes
 SENSOR_TIMEOUT = 30  # 30 seconds
+
+# Task lists larger than this are processed in an executor job, unless
+# overridden in the integration options
+PROCESSING_EXECUTOR_THRESHOLD = 500
+
+# Task query filters that can be pushed to the server
+TASK_FILTER_OPEN = "open"
+TASK_FILTER_DUE_WINDOW = "due_window"
+TASK_FILTER_FIELDS = "fields"
+
+# Lightweight task fields requested for the task list
+TASK_LIST_FIELDS = (
+    "id",
+    "name",
+    "status",
+    "priority",
+    "due_date",
+    "today",
+    "updated_at",
+)
+
+# Heavy task fields only fetched for the tasks that are displayed
+TASK_DETAIL_FIELDS = (
+    "note",
+    "Project",
+    "Tags",
+    "created_at",
+)
+TASK_DETAIL_PATH = "/api/task/{task_id}"
+TASK_DETAIL_CACHE_SIZE = 64
+
+# Number of upcoming todos shown on the upcoming todos sensor
+UPCOMING_TODOS_LIMIT = 5
+
+# Paginated task fetching
+TASKS_PAGE_SIZE = 500
+TASKS_PAGE_CONCURRENCY = 4
+TASKS_PAGE_RETRIES = 2
+TASKS_PAGE_RETRY_DELAY = 1  # seconds, multiplied by the attempt number
+SENSOR_SYNC_TIMEOUT = 120  # whole refresh, SENSOR_TIMEOUT applies per request
+PROBE_TIMEOUT = 120  # whole config flow probe
+
+# Pagination styles supported by the server
+PAGINATION_OFFSET = "offset"
+PAGINATION_CURSOR = "cursor"
+PAGINATION_NONE = "none"
+
+# Server capabilities detected by the config flow probe
+CONF_CAPABILITIES = "capabilities"
+CAPABILITY_LATENCY = "latency_ms"
+CAPABILITY_API_VERSION = "api_version"
+CAPABILITY_CONDITIONAL = "conditional_requests"
+CAPABILITY_COMPRESSION = "compression"
+CAPABILITY_FILTERS = "filters"
+CAPABILITY_PAGINATION = "pagination"
+
+# Events fired on the Home Assistant bus when tasks change
+EVENT_TASK_ADDED = f"{DOMAIN}_task_added"
+EVENT_TASK_CHANGED = f"{DOMAIN}_task_changed"
+EVENT_TASK_COMPLETED = f"{DOMAIN}_task_completed"
+EVENT_TASK_REMOVED = f"{DOMAIN}_task_removed"
+EVENT_TASK_BECAME_DUE = f"{DOMAIN}_task_became_due"
+
+# Two-tier polling, used when the server supports conditional requests:
+# a cheap conditional check on a short interval, and a full sync at least
+# this often
+HEARTBEAT_INTERVAL = 60  # 1 minute
+FULL_SYNC_INTERVAL = 3600  # 1 hour
+# Filters with unknown server support are checked again after this long
+FILTER_DETECT_INTERVAL = 86400  # 1 day
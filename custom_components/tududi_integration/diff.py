@@ -0,0 +1,111 @@
+"""Task change detection for the Tududi integration."""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .processing import TASK_STATUS_DONE
+
+
+def task_fingerprint(task: Dict[str, Any]) -> str:
+    """Return a value that changes whenever the task content changes.
+
+    Tududi bumps updated_at on every edit, so it is used directly when
+    present. Otherwise the task is hashed.
+    """
+    updated_at = task.get("updated_at")
+    if updated_at:
+        return str(updated_at)
+    content = json.dumps(task, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+@dataclass
+class TaskChanges:
+    """Changes between two refreshes."""
+
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    completed: List[Dict[str, Any]] = field(default_factory=list)
+    # Snapshots of tasks that are no longer in the task list
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    became_due: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Return True if anything changed."""
+        return bool(
+            self.added or self.changed or self.completed or self.removed or self.became_due
+        )
+
+
+class TaskDiffEngine:
+    """Keep a fingerprint per task and report what changed between refreshes."""
+
+    def __init__(self) -> None:
+        """Initialize the diff engine."""
+        # Task id -> (fingerprint, status, snapshot for removal events)
+        self._known: Dict[Any, Tuple[str, Any, Dict[str, Any]]] = {}
+        self._today_ids: set = set()
+        self._initialized = False
+
+    def diff(
+        self, tasks: List[Dict[str, Any]], today_ids: Iterable[Any]
+    ) -> TaskChanges:
+        """Compare tasks against the previous refresh.
+
+        The first call only records the current state and reports nothing.
+        """
+        changes = TaskChanges()
+        known = self._known
+        current: Dict[Any, Tuple[str, Any, Dict[str, Any]]] = {}
+        by_id: Dict[Any, Dict[str, Any]] = {}
+
+        for task in tasks:
+            task_id = task.get("id")
+            fingerprint = task_fingerprint(task)
+            status = task.get("status")
+            previous: Optional[Tuple[str, Any, Dict[str, Any]]] = known.get(task_id)
+            if previous is not None and previous[0] == fingerprint:
+                # Unchanged, reuse the stored entry
+                current[task_id] = previous
+                by_id[task_id] = task
+                continue
+
+            current[task_id] = (fingerprint, status, task_snapshot(task))
+            by_id[task_id] = task
+            if previous is None:
+                changes.added.append(task)
+            elif status == TASK_STATUS_DONE and previous[1] != TASK_STATUS_DONE:
+                changes.completed.append(task)
+            else:
+                changes.changed.append(task)
+
+        today_ids = set(today_ids)
+        if len(current) != len(known) or changes.added:
+            changes.removed = [
+                entry[2] for task_id, entry in known.items() if task_id not in current
+            ]
+        changes.became_due = [
+            by_id[task_id] for task_id in today_ids - self._today_ids if task_id in by_id
+        ]
+
+        self._known = current
+        self._today_ids = today_ids
+        if not self._initialized:
+            self._initialized = True
+            return TaskChanges()
+        return changes
+
+
+def task_snapshot(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the task fields included in task events."""
+    return {
+        "task_id": task.get("id"),
+        "name": task.get("name", "Unnamed Task"),
+        "due_date": task.get("due_date"),
+        "priority": task.get("priority", 0),
+        "status": task.get("status"),
+        "today": task.get("today", False),
+    }
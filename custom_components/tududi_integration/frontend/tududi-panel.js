@@ -0,0 +1,184 @@
+// Tududi sidebar panel that keeps its iframe loaded across panel switches.
+//
+// Home Assistant removes a panel's element when you switch to another
+// panel, and a detached iframe loses its page. Instead the iframe lives
+// directly in document.body, is positioned over the panel area while the
+// panel is shown and hidden (but kept loaded) while it isn't.
+
+const ELEMENT_NAME = "tududi-warm-panel";
+const frames = new Map();
+let panelsSubscription;
+
+function removeFrame(url) {
+  const frame = frames.get(url);
+  if (frame) {
+    frame.remove();
+    frames.delete(url);
+  }
+}
+
+// Drop frames whose keep-warm panel was removed or now points elsewhere,
+// e.g. after the entry was unloaded or reconfigured
+function pruneFrames(panels) {
+  const urls = new Set(
+    Object.values(panels)
+      .filter((panel) => panel.config && panel.config._panel_custom
+        && panel.config._panel_custom.name === ELEMENT_NAME)
+      .map((panel) => panel.config.url)
+  );
+  for (const url of [...frames.keys()]) {
+    if (!urls.has(url)) {
+      removeFrame(url);
+    }
+  }
+}
+
+function watchPanels(hass) {
+  if (panelsSubscription || !hass || !hass.connection) {
+    return;
+  }
+  const connection = hass.connection;
+  panelsSubscription = connection
+    .subscribeEvents(async () => {
+      try {
+        pruneFrames(await connection.sendMessagePromise({ type: "get_panels" }));
+      } catch (e) {
+        // Keep the frames, they are pruned on the next update
+      }
+    }, "panels_updated")
+    .catch(() => {
+      panelsSubscription = undefined;
+    });
+}
+
+function addConnectionHints(url) {
+  let origin;
+  try {
+    origin = new URL(url, window.location.href).origin;
+  } catch (e) {
+    return;
+  }
+  for (const rel of ["preconnect", "dns-prefetch"]) {
+    if (document.head.querySelector(`link[rel="${rel}"][href="${origin}"]`)) {
+      continue;
+    }
+    const link = document.createElement("link");
+    link.rel = rel;
+    link.href = origin;
+    if (rel === "preconnect") {
+      link.crossOrigin = "";
+    }
+    document.head.appendChild(link);
+  }
+}
+
+class TududiWarmPanel extends HTMLElement {
+  constructor() {
+    super();
+    this._root = this.attachShadow({ mode: "open" });
+    this._root.innerHTML = `
+      <style>
+        :host { display: flex; flex-direction: column; height: 100%; }
+        .toolbar {
+          display: flex; align-items: center; height: var(--header-height, 56px);
+          padding: 0 12px; box-sizing: border-box;
+          background: var(--app-header-background-color, var(--primary-color));
+          color: var(--app-header-text-color, white);
+          font-size: 20px;
+        }
+        .toolbar[hidden] { display: none; }
+        .title { margin-left: 12px; }
+        .frame-area { flex: 1; }
+      </style>
+      <div class="toolbar" hidden>
+        <ha-menu-button></ha-menu-button>
+        <div class="title"></div>
+      </div>
+      <div class="frame-area"></div>
+    `;
+    this._toolbar = this._root.querySelector(".toolbar");
+    this._menuButton = this._root.querySelector("ha-menu-button");
+    this._area = this._root.querySelector(".frame-area");
+    this._observer = new ResizeObserver(() => this._position());
+  }
+
+  set hass(hass) {
+    this._menuButton.hass = hass;
+    watchPanels(hass);
+  }
+
+  set narrow(narrow) {
+    // The sidebar can't be opened without a menu button on small screens
+    this._toolbar.hidden = !narrow;
+    this._menuButton.narrow = narrow;
+    this._position();
+  }
+
+  set panel(panel) {
+    if (this._config && this._config.url !== panel.config.url) {
+      removeFrame(this._config.url);
+    }
+    this._config = panel.config;
+    this._root.querySelector(".title").textContent = panel.config.title || "";
+    this._show();
+  }
+
+  connectedCallback() {
+    this._observer.observe(this._area);
+    window.addEventListener("resize", this._onResize);
+    this._show();
+  }
+
+  disconnectedCallback() {
+    this._observer.disconnect();
+    window.removeEventListener("resize", this._onResize);
+    const frame = this._frame();
+    if (frame) {
+      frame.style.visibility = "hidden";
+      frame.style.pointerEvents = "none";
+    }
+  }
+
+  _onResize = () => this._position();
+
+  _frame() {
+    return this._config ? frames.get(this._config.url) : undefined;
+  }
+
+  _show() {
+    if (!this.isConnected || !this._config) {
+      return;
+    }
+    let frame = this._frame();
+    if (!frame) {
+      addConnectionHints(this._config.url);
+      frame = document.createElement("iframe");
+      frame.src = this._config.url;
+      frame.title = this._config.title || "Tududi";
+      Object.assign(frame.style, { position: "fixed", border: "none", zIndex: 1 });
+      document.body.appendChild(frame);
+      frames.set(this._config.url, frame);
+    }
+    frame.style.visibility = "visible";
+    frame.style.pointerEvents = "auto";
+    this._position();
+  }
+
+  _position() {
+    const frame = this._frame();
+    if (!frame || !this.isConnected) {
+      return;
+    }
+    const rect = this._area.getBoundingClientRect();
+    Object.assign(frame.style, {
+      top: `${rect.top}px`,
+      left: `${rect.left}px`,
+      width: `${rect.width}px`,
+      height: `${rect.height}px`,
+    });
+  }
+}
+
+if (!customElements.get(ELEMENT_NAME)) {
+  customElements.define(ELEMENT_NAME, TududiWarmPanel);
+}
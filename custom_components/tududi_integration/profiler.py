@@ -0,0 +1,278 @@
+"""On-demand profiling for the Tududi integration.
+
+Nothing in here is imported or patched until the profile service is
+called, which starts a run in the background and returns. For the duration of a run the coordinator methods, the processing
+function and the sensor properties are wrapped with cProfile, and
+tracemalloc records allocations. Afterwards the originals are restored.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_STATS_LINES = 40
+PROFILE_ALLOCATION_LINES = 25
+
+COORDINATOR_METHODS = ("_fetch_tududi_data", "_process_tududi_data")
+SENSOR_PROPERTIES = ("native_value", "extra_state_attributes")
+
+
+class TududiProfiler:
+    """Collect cProfile stats from wrapped callables.
+
+    Each thread gets its own profile so work handed to the executor is
+    included. Nested wrapped calls only profile the outermost one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles: List[cProfile.Profile] = []
+        self._skipped = 0
+        self.calls: Dict[str, int] = {}
+
+    def _enter(self, name: str) -> bool:
+        """Start profiling this thread unless already active."""
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            return False
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active, e.g. on Python 3.12+ where
+            # profiling covers all threads at once
+            with self._lock:
+                self._skipped += 1
+            return False
+        self._local.depth = 1
+        return True
+
+    def _exit(self, started: bool) -> None:
+        """Stop profiling when the outermost wrapped call returns."""
+        depth = getattr(self._local, "depth", 0)
+        if not depth:
+            return
+        self._local.depth = depth - 1
+        if started or depth == 1:
+            self._local.profile.disable()
+            self._local.depth = 0
+
+    def wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a function so its calls are profiled."""
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = self._enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(started)
+
+        return wrapper
+
+    def wrap_async(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a coroutine function so its calls are profiled.
+
+        Other event loop tasks that run while it awaits are included.
+        """
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = self._enter(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._exit(started)
+
+        return wrapper
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """Return the stats of all threads merged, None if nothing ran."""
+        merged: Optional[pstats.Stats] = None
+        for profile in self._profiles:
+            try:
+                if merged is None:
+                    merged = pstats.Stats(profile)
+                else:
+                    merged.add(profile)
+            except TypeError:
+                # Profile without any data
+                continue
+        return merged
+
+    def report(self, snapshot: Optional[tracemalloc.Snapshot], component_dir: str) -> str:
+        """Return a text summary of the collected stats and allocations."""
+        output = io.StringIO()
+        output.write("Tududi integration profile\n\n")
+        output.write(f"Wrapped calls: {self.calls or 'none'}\n")
+        if self._skipped:
+            output.write(f"Calls not profiled (another profiler active): {self._skipped}\n")
+
+        output.write("\nTop functions by cumulative time\n")
+        stats = self.stats()
+        if stats is None:
+            output.write("No profiled calls.\n")
+        else:
+            stats.stream = output
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_STATS_LINES)
+
+        if snapshot is not None:
+            for title, filtered in (
+                ("Top allocations in the integration", snapshot.filter_traces(
+                    [tracemalloc.Filter(True, f"{component_dir}/*")]
+                )),
+                ("Top allocations overall", snapshot),
+            ):
+                output.write(f"\n{title}\n")
+                for stat in filtered.statistics("lineno")[:PROFILE_ALLOCATION_LINES]:
+                    output.write(f"{stat}\n")
+        return output.getvalue()
+
+
+def _patch(
+    coordinators: List[Any], sensor_class: Optional[type], profiler: TududiProfiler
+) -> Callable[[], None]:
+    """Wrap the profiled callables, returning a function that undoes it."""
+    undo: List[Callable[[], None]] = []
+
+    for coordinator in coordinators:
+        for method in COORDINATOR_METHODS:
+            original = getattr(coordinator, method)
+            setattr(coordinator, method, profiler.wrap_async(method, original))
+            undo.append(functools.partial(delattr, coordinator, method))
+
+    if sensor_class is not None:
+        from . import sensor
+
+        original_process = sensor.process_tasks
+        sensor.process_tasks = profiler.wrap("process_tasks", original_process)
+        undo.append(functools.partial(setattr, sensor, "process_tasks", original_process))
+
+        for name in SENSOR_PROPERTIES:
+            prop = sensor_class.__dict__[name]
+            setattr(
+                sensor_class,
+                name,
+                property(profiler.wrap(f"{sensor_class.__name__}.{name}", prop.fget)),
+            )
+            undo.append(functools.partial(setattr, sensor_class, name, prop))
+
+    def restore() -> None:
+        for step in reversed(undo):
+            step()
+
+    return restore
+
+
+@callback
+def async_start_profile(hass: HomeAssistant, duration: float) -> None:
+    """Start profiling the integration in the background.
+
+    Returns right away. A persistent notification names the written files
+    once the run is over.
+    """
+    if hass.data.get(DOMAIN + "_profiling"):
+        raise HomeAssistantError("A Tududi profile is already running")
+    hass.data[DOMAIN + "_profiling"] = True
+    hass.async_create_background_task(
+        _async_run_profile(hass, duration), f"{DOMAIN} profile"
+    )
+
+
+async def _async_run_profile(hass: HomeAssistant, duration: float) -> None:
+    """Run a profile started by async_start_profile and report the result."""
+    try:
+        paths = await async_profile(hass, duration)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Profiling the Tududi integration failed")
+        return
+    finally:
+        hass.data.pop(DOMAIN + "_profiling", None)
+
+    persistent_notification.async_create(
+        hass,
+        "The Tududi profile was written to "
+        + " and ".join(f"`{path}`" for path in paths)
+        + ".",
+        title="Tududi profile finished",
+        notification_id=f"{DOMAIN}_profile",
+    )
+
+
+async def async_profile(hass: HomeAssistant, duration: float) -> List[str]:
+    """Profile the integration for a while and write the results.
+
+    Returns the paths of the written files, the cProfile dump (if anything
+    was profiled) and the text summary. The caller
+    guards against overlapping runs, see async_start_profile.
+    """
+    coordinators = list(hass.data.get(DOMAIN + "_coordinators", {}).values())
+    sensor_class = None
+    if coordinators:
+        # The sensor platform is loaded whenever a coordinator exists
+        from .sensor import TududiSensor
+
+        sensor_class = TududiSensor
+
+    profiler = TududiProfiler()
+    started_tracemalloc = not tracemalloc.is_tracing()
+    restore = _patch(coordinators, sensor_class, profiler)
+    if started_tracemalloc:
+        tracemalloc.start()
+    _LOGGER.info("Profiling the Tududi integration for %s seconds", duration)
+
+    try:
+        await asyncio.sleep(duration)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        restore()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stats_path = hass.config.path(f"tududi_profile_{timestamp}.prof")
+    summary_path = hass.config.path(f"tududi_profile_{timestamp}.txt")
+    component_dir = str(Path(__file__).parent)
+
+    def write_results() -> List[str]:
+        """Write the profile files synchronously."""
+        written = []
+        stats = profiler.stats()
+        if stats is not None:
+            stats.dump_stats(stats_path)
+            written.append(stats_path)
+        summary = profiler.report(snapshot, component_dir)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(summary)
+        written.append(summary_path)
+        return written
+
+    paths = await hass.async_add_executor_job(write_results)
+    _LOGGER.info("Tududi profile written to %s", ", ".join(paths))
+    return paths
@@ -0,0 +1,160 @@
+"""Task query planning for the Tududi integration.
+
+A query plan describes which tasks the integration actually needs. Filters
+the server is known to support are sent as query parameters, everything
+else is applied client-side after the fetch so results are the same either
+way.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .const import (
+    TASK_LIST_FIELDS,
+    TASK_FILTER_DUE_WINDOW,
+    TASK_FILTER_FIELDS,
+    TASK_FILTER_OPEN,
+)
+from .processing import TASK_STATUS_DONE, parse_due_date
+
+if TYPE_CHECKING:
+    from .api import TududiApiClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Filters that restrict which tasks are returned (as opposed to fields)
+ROW_FILTERS = (TASK_FILTER_OPEN, TASK_FILTER_DUE_WINDOW)
+
+
+@dataclass
+class TaskQueryPlan:
+    """Description of the tasks the integration needs from Tududi."""
+
+    # Skip completed tasks
+    open_only: bool = True
+    # Keep tasks due on/after this date, flagged for today or without a due date
+    due_from: Optional[date] = None
+    # Task fields the integration reads
+    fields: Tuple[str, ...] = field(default=TASK_LIST_FIELDS)
+
+    def active_filters(self) -> List[str]:
+        """Return the names of the filters this plan uses."""
+        filters = []
+        if self.open_only:
+            filters.append(TASK_FILTER_OPEN)
+        if self.due_from is not None:
+            filters.append(TASK_FILTER_DUE_WINDOW)
+        if self.fields:
+            filters.append(TASK_FILTER_FIELDS)
+        return filters
+
+    def filter_params(self, name: str) -> Dict[str, str]:
+        """Return the query parameters for a single filter."""
+        if name == TASK_FILTER_OPEN:
+            return {"status": "not_done"}
+        if name == TASK_FILTER_DUE_WINDOW and self.due_from is not None:
+            return {"due_date_from": self.due_from.isoformat(), "include_undated": "true"}
+        if name == TASK_FILTER_FIELDS:
+            return {"fields": ",".join(self.fields)}
+        return {}
+
+    def to_params(self, supported: Iterable[str]) -> Dict[str, str]:
+        """Build the query parameters for the filters the server supports."""
+        params: Dict[str, str] = {}
+        supported = set(supported)
+        for name in self.active_filters():
+            if name in supported:
+                params.update(self.filter_params(name))
+        return params
+
+    def matches_filter(self, name: str, task: Dict[str, Any]) -> bool:
+        """Return True if a task passes the given row filter."""
+        if name == TASK_FILTER_OPEN:
+            return task.get("status") != TASK_STATUS_DONE
+        if name == TASK_FILTER_DUE_WINDOW and self.due_from is not None:
+            if task.get("today", False):
+                return True
+            due_date = task.get("due_date")
+            if not due_date:
+                return True
+            parsed = parse_due_date(due_date)
+            return parsed is None or parsed >= self.due_from
+        return True
+
+    def apply(self, tasks: List[Dict[str, Any]], pushed: Iterable[str]) -> List[Dict[str, Any]]:
+        """Apply the row filters that were not handled by the server."""
+        pushed = set(pushed)
+        pending = [name for name in ROW_FILTERS if name in self.active_filters() and name not in pushed]
+        if not pending:
+            return tasks
+        return [
+            task for task in tasks
+            if all(self.matches_filter(name, task) for name in pending)
+        ]
+
+
+def detect_row_filter_support(
+    plan: TaskQueryPlan,
+    name: str,
+    baseline: List[Dict[str, Any]],
+    filtered: List[Dict[str, Any]],
+) -> Optional[bool]:
+    """Compare a server-filtered result against the unfiltered baseline.
+
+    Returns None when the baseline cannot tell (nothing would be filtered
+    out, or nothing would be kept).
+    """
+    expected = {task.get("id") for task in baseline if plan.matches_filter(name, task)}
+    if not expected or len(expected) == len(baseline):
+        return None
+    return {task.get("id") for task in filtered} == expected
+
+
+def detect_fields_support(plan: TaskQueryPlan, filtered: List[Dict[str, Any]]) -> Optional[bool]:
+    """Check whether the server trimmed tasks to the requested fields."""
+    if not filtered:
+        return None
+    allowed = set(plan.fields)
+    return all(set(task) <= allowed for task in filtered)
+
+
+async def async_detect_filter_support(
+    client: TududiApiClient,
+    plan: TaskQueryPlan,
+    baseline: List[Dict[str, Any]],
+    names: Iterable[str],
+) -> Dict[str, bool]:
+    """Detect which query filters the server supports.
+
+    Each filter is requested on its own and compared against the unfiltered
+    baseline. Filters the server rejects with a client error are reported
+    as unsupported. Inconclusive results (e.g. no completed tasks to filter
+    out yet, or a failed request) are left out so they are detected again
+    later, and fall back to client-side filtering until then.
+    """
+    support: Dict[str, bool] = {}
+    for name in names:
+        try:
+            filtered = await client.async_get_tasks_paged(plan.filter_params(name))
+        except Exception as err:  # pylint: disable=broad-except
+            status = getattr(err, "status", None)
+            if status is not None and 400 <= status < 500:
+                _LOGGER.debug("Tududi rejected the %s filter: %s", name, err)
+                support[name] = False
+            else:
+                _LOGGER.debug("Could not check the %s filter: %s", name, err)
+            continue
+
+        tasks = filtered.get("tasks", [])
+        if name == TASK_FILTER_FIELDS:
+            supported = detect_fields_support(plan, tasks)
+        else:
+            supported = detect_row_filter_support(plan, name, baseline, tasks)
+        if supported is not None:
+            support[name] = supported
+
+    _LOGGER.debug("Tududi server-side filter support: %s", support)
+    return support
@@ -3,10 +3,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
-import aiohttp
 import async_timeout
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.config_entries import ConfigEntry
@@ -24,9 +24,36 @@ from .const import (
     CONF_TITLE,
     CONF_USERNAME,
     CONF_PASSWORD,
+    CONF_CAPABILITIES,
+    CONF_EXECUTOR_THRESHOLD,
+    CAPABILITY_CONDITIONAL,
+    CAPABILITY_FILTERS,
+    CAPABILITY_PAGINATION,
     SENSOR_UPDATE_INTERVAL,
+    SENSOR_SYNC_TIMEOUT,
     SENSOR_TIMEOUT,
+    HEARTBEAT_INTERVAL,
+    FULL_SYNC_INTERVAL,
+    FILTER_DETECT_INTERVAL,
+    PAGINATION_CURSOR,
+    PAGINATION_NONE,
+    PAGINATION_OFFSET,
+    PROCESSING_EXECUTOR_THRESHOLD,
+    TASK_DETAIL_FIELDS,
+    TASK_FILTER_FIELDS,
+    TASKS_PAGE_CONCURRENCY,
+    TASKS_PAGE_SIZE,
+    EVENT_TASK_ADDED,
+    EVENT_TASK_BECAME_DUE,
+    EVENT_TASK_CHANGED,
+    EVENT_TASK_COMPLETED,
+    EVENT_TASK_REMOVED,
 )
+from .api import TududiApiClient, TududiApiError
+from .cache import TaskDetailCache
+from .diff import TaskDiffEngine, task_snapshot
+from .processing import TASK_STATUS_DONE, process_tasks
+from .query import TaskQueryPlan, async_detect_filter_support
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,201 +85,405 @@ class TududiDataUpdateCoordinator(DataUpdateCoordinator):
         base_url: str,
         username: Optional[str] = None,
         password: Optional[str] = None,
+        executor_threshold: int = PROCESSING_EXECUTOR_THRESHOLD,
+        capabilities: Optional[Dict[str, Any]] = None,
+        entry_id: Optional[str] = None,
     ) -> None:
         """Initialize the coordinator."""
-        self.base_url = base_url.rstrip("/")
-        self.username = username
-        self.password = password
-        self._session = None
+        self.client = TududiApiClient(base_url, username, password)
+        self.entry_id = entry_id
+        self.executor_threshold = executor_threshold
+        # Server capabilities detected by the config flow, if any
+        self.capabilities: Dict[str, Any] = capabilities or {}
+        # Query filters the server honours, detected on the first refresh
+        # unless the config flow already did. Filters whose detection was
+        # inconclusive are missing and checked again later.
+        self.filter_support: Dict[str, bool] = dict(
+            self.capabilities.get(CAPABILITY_FILTERS) or {}
+        )
+        self._last_filter_detection: Optional[float] = None
+        self.client.pagination_mode = self.capabilities.get(CAPABILITY_PAGINATION)
+        # Full details of the displayed tasks, keyed by id and updated_at
+        self.detail_cache = TaskDetailCache()
+        # Per-task fingerprints used to fire task events
+        self.diff_engine = TaskDiffEngine()
+        # Two-tier polling: frequent conditional checks between full syncs.
+        # Only for unpaged task lists, see _check_two_tier
+        self.two_tier = bool(
+            self.capabilities.get(CAPABILITY_CONDITIONAL)
+        ) and self.capabilities.get(CAPABILITY_PAGINATION) in (None, PAGINATION_NONE)
+        self._last_full_sync: Optional[float] = None
+        # Date the current data was categorised for
+        self._processed_date: Optional[date] = None
+        # (query params, ETag, Last-Modified) of the last full task list
+        self._validators: Optional[Tuple[Dict[str, str], Optional[str], Optional[str]]] = None
         
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=SENSOR_UPDATE_INTERVAL),
+            update_interval=timedelta(
+                seconds=HEARTBEAT_INTERVAL if self.two_tier else SENSOR_UPDATE_INTERVAL
+            ),
         )
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Update data via library."""
         try:
-            async with async_timeout.timeout(SENSOR_TIMEOUT):
+            async with async_timeout.timeout(SENSOR_SYNC_TIMEOUT):
                 return await self._fetch_tududi_data()
         except Exception as exception:
             _LOGGER.warning("Error communicating with Tududi API: %s", exception)
+            # Start over with a full sync next time
+            self._last_full_sync = None
+            self._validators = None
             # Return empty data instead of raising exception so sensors stay available
             return {
                 "next_todo": None,
+                "upcoming_todos": [],
                 "upcoming_todos_count": 0,
                 "today_todos_count": 0,
+                "today_task_ids": [],
                 "all_tasks": [],
                 "metrics": {},
             }
 
-    async def _authenticate(self, session: aiohttp.ClientSession) -> bool:
-        """Authenticate with Tududi server."""
-        if not self.username or not self.password:
-            _LOGGER.debug("No credentials provided, trying without authentication")
-            return True
-
-        try:
-            # Login to Tududi - based on the actual API endpoints
-            login_url = f"{self.base_url}/api/login"
-            login_data = {
-                "email": self.username,
-                "password": self.password,
-            }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
-            
-            async with session.post(login_url, json=login_data, headers=headers) as response:
-                if response.status == 200:
-                    _LOGGER.debug("Successfully authenticated with Tududi")
-                    # Session cookies should be automatically stored in the session
-                    return True
-                else:
-                    response_text = await response.text()
-                    _LOGGER.error(
-                        "Failed to authenticate with Tududi: %s - %s", 
-                        response.status, response_text
-                    )
-                    return False
-                    
-        except Exception as exception:
-            _LOGGER.error("Authentication error: %s", exception)
-            return False
-
     async def async_shutdown(self) -> None:
         """Close the session when coordinator is shutting down."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        await self.client.async_close()
 
     async def _fetch_tududi_data(self) -> Dict[str, Any]:
         """Fetch data from Tududi API."""
-        # Create or reuse session
-        if not self._session or self._session.closed:
-            connector = aiohttp.TCPConnector(force_close=True, enable_cleanup_closed=True)
-            self._session = aiohttp.ClientSession(connector=connector)
-
         try:
-            # Authenticate if credentials are provided
-            if not await self._authenticate(self._session):
-                raise UpdateFailed("Authentication failed")
+            plan = self._build_query_plan()
+            if self._heartbeat_due(plan):
+                data = await self._async_heartbeat(plan)
+                if data is None:
+                    # Nothing changed since the last sync
+                    return self.data
+            else:
+                data = await self._async_full_sync(plan)
 
-            # Fetch tasks - use the correct API endpoint
-            tasks_url = f"{self.base_url}/api/tasks"
-            
-            headers = {
-                "Accept": "application/json",
-                "X-Requested-With": "XMLHttpRequest",
-            }
-            
-            async with self._session.get(tasks_url, headers=headers) as response:
-                if response.status == 401:
-                    # Session expired, try to re-authenticate
-                    if await self._authenticate(self._session):
-                        async with self._session.get(tasks_url, headers=headers) as retry_response:
-                            if retry_response.status == 200:
-                                data = await retry_response.json()
-                            else:
-                                response_text = await retry_response.text()
-                                raise UpdateFailed(f"API request failed: {retry_response.status} - {response_text}")
-                    else:
-                        raise UpdateFailed("Authentication failed")
-                elif response.status == 200:
-                    data = await response.json()
-                else:
-                    response_text = await response.text()
-                    raise UpdateFailed(f"API request failed: {response.status} - {response_text}")
-
-            return await self._process_tududi_data(data)
+            result = await self._process_tududi_data(data)
+            await self._async_detect_changes(result)
+            return await self._async_attach_details(result)
             
         except Exception as exception:
             _LOGGER.error("Error fetching Tududi data: %s", exception)
             raise UpdateFailed(f"Error fetching data: {exception}")
 
+    async def _async_full_sync(self, plan: TaskQueryPlan) -> Dict[str, Any]:
+        """Fetch the whole task list."""
+        # Authenticate if credentials are provided
+        if not await self.client.authenticate():
+            raise UpdateFailed("Authentication failed")
+
+        # Filter detection makes extra requests, so the validators of the
+        # last one don't belong to the task list query
+        detecting = bool(self._pending_filters(plan))
+        data = await self._fetch_tasks(plan)
+        self._last_full_sync = time.monotonic()
+        self._check_two_tier()
+        if detecting:
+            self._validators = None
+        else:
+            self._store_validators(plan)
+        return data
+
+    def _build_query_plan(self) -> TaskQueryPlan:
+        """Build the query plan for the next refresh."""
+        # Overdue tasks that aren't flagged for today are never shown
+        return TaskQueryPlan(due_from=datetime.now().date())
+
+    def _pending_filters(self, plan: TaskQueryPlan) -> List[str]:
+        """Return the filters whose server support should be detected now."""
+        pending = [name for name in plan.active_filters() if name not in self.filter_support]
+        if pending and self._last_filter_detection is not None and (
+            time.monotonic() - self._last_filter_detection < FILTER_DETECT_INTERVAL
+        ):
+            # Inconclusive last time, filter client-side until the next try
+            return []
+        return pending
+
+    def _pushed_filters(self) -> List[str]:
+        """Return the filters the server is known to support."""
+        return [name for name, supported in self.filter_support.items() if supported]
+
+    def _heartbeat_due(self, plan: TaskQueryPlan) -> bool:
+        """Return True if a cheap conditional check can replace a full sync."""
+        if not self.two_tier or not self.data or self._last_full_sync is None:
+            return False
+        if time.monotonic() - self._last_full_sync >= FULL_SYNC_INTERVAL:
+            return False
+        if plan.due_from != self._processed_date:
+            # A new day: today's and upcoming todos must be recategorised
+            # even if the task list itself didn't change
+            return False
+        if self._pending_filters(plan):
+            return False
+        # Validators only apply to the same query
+        return self._validators is None or self._validators[0] == self._heartbeat_params(plan)
+
+    def _check_two_tier(self) -> None:
+        """Fall back to plain polling if the server paginates the task list.
+
+        A conditional check of a paged list would download everything in
+        one request whenever something changed, and may be truncated to
+        the server's default page size. Lists that fit in a single page
+        (pagination mode still unknown) keep two-tier polling.
+        """
+        if self.two_tier and self.client.pagination_mode in (
+            PAGINATION_OFFSET, PAGINATION_CURSOR
+        ):
+            _LOGGER.debug("Tududi paginates the task list, disabling two-tier polling")
+            self.two_tier = False
+            self._validators = None
+            self.update_interval = timedelta(seconds=SENSOR_UPDATE_INTERVAL)
+
+    def _heartbeat_params(self, plan: TaskQueryPlan) -> Dict[str, str]:
+        """Return the query of the single request holding the whole list."""
+        params = plan.to_params(self._pushed_filters())
+        if self.client.pagination_mode is None:
+            # The list fit in the first page of the full sync
+            params.update({"limit": str(TASKS_PAGE_SIZE), "offset": "0"})
+        return params
+
+    def _store_validators(self, plan: TaskQueryPlan) -> None:
+        """Remember the validators of a full sync made in one request."""
+        self._validators = None
+        stats = self.client.last_fetch_stats
+        if self.two_tier and (stats.get("etag") or stats.get("last_modified")):
+            self._validators = (
+                self._heartbeat_params(plan),
+                stats.get("etag"),
+                stats.get("last_modified"),
+            )
+
+    async def _async_heartbeat(self, plan: TaskQueryPlan) -> Optional[Dict[str, Any]]:
+        """Check whether the task list changed since the last sync.
+
+        Returns None if it didn't, otherwise the new task list. Only used
+        while the list comes in a single request. Without stored validators
+        the first check downloads the list once to obtain them.
+        """
+        pushed = self._pushed_filters()
+        params = self._heartbeat_params(plan)
+        etag = last_modified = None
+        if self._validators is not None:
+            _params, etag, last_modified = self._validators
+
+        async with async_timeout.timeout(SENSOR_TIMEOUT):
+            status, headers, data = await self.client.async_get_conditional(
+                "/api/tasks", params, etag, last_modified
+            )
+        if status == 304:
+            _LOGGER.debug("Tududi tasks unchanged since the last sync")
+            return None
+
+        tasks = data.get("tasks", [])
+        if self.client.pagination_mode is None and len(tasks) >= TASKS_PAGE_SIZE:
+            # The list outgrew a single page, fetch it page by page
+            return await self._async_full_sync(plan)
+
+        self._validators = (params, headers.get("ETag"), headers.get("Last-Modified"))
+        data["tasks"] = plan.apply(tasks, pushed)
+        return data
+
+    async def _fetch_tasks(self, plan: TaskQueryPlan) -> Dict[str, Any]:
+        """Fetch tasks, pushing the filters the server supports."""
+        pending = self._pending_filters(plan)
+        if pending:
+            # Fetch everything and compare it against server-filtered
+            # results to learn which filters are honoured
+            data = await self.client.async_get_tasks_paged()
+            detected = await async_detect_filter_support(
+                self.client, plan, data.get("tasks", []), pending
+            )
+            self._last_filter_detection = time.monotonic()
+            if detected:
+                self.filter_support.update(detected)
+                self._async_store_filter_support()
+            pushed: List[str] = []
+        else:
+            pushed = self._pushed_filters()
+            data = await self.client.async_get_tasks_paged(plan.to_params(pushed))
+
+        data["tasks"] = plan.apply(data.get("tasks", []), pushed)
+        return data
+
+    def _async_store_filter_support(self) -> None:
+        """Save the detected filter support in the config entry.
+
+        The next start can then skip detecting it again. The update listener
+        doesn't reload the entry for these updates.
+        """
+        entry = self.hass.config_entries.async_get_entry(self.entry_id) if self.entry_id else None
+        if entry is None:
+            return
+        capabilities = dict(entry.data.get(CONF_CAPABILITIES) or {})
+        if capabilities.get(CAPABILITY_FILTERS) == self.filter_support:
+            return
+        capabilities[CAPABILITY_FILTERS] = dict(self.filter_support)
+        internal_updates = self.hass.data.setdefault(DOMAIN + "_internal_updates", set())
+        internal_updates.add(entry.entry_id)
+        updated = self.hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_CAPABILITIES: capabilities}
+        )
+        if updated is False:
+            internal_updates.discard(entry.entry_id)
+
+    async def _async_detect_changes(self, result: Dict[str, Any]) -> None:
+        """Diff the tasks against the previous refresh and fire task events."""
+        tasks = result["all_tasks"]
+        if len(tasks) > self.executor_threshold:
+            changes = await self.hass.async_add_executor_job(
+                self.diff_engine.diff, tasks, result["today_task_ids"]
+            )
+        else:
+            changes = self.diff_engine.diff(tasks, result["today_task_ids"])
+        if not changes:
+            return
+
+        for event_type, items in (
+            (EVENT_TASK_ADDED, changes.added),
+            (EVENT_TASK_CHANGED, changes.changed),
+            (EVENT_TASK_COMPLETED, changes.completed),
+            (EVENT_TASK_BECAME_DUE, changes.became_due),
+        ):
+            for task in items:
+                self.hass.bus.async_fire(
+                    event_type, {"entry_id": self.entry_id, **task_snapshot(task)}
+                )
+        if changes.removed:
+            # Looking up dropped tasks can take a while, so it runs after the
+            # refresh and can't hold it up or fail it. Tied to the entry, so
+            # unloading it cancels the lookup.
+            report = self._async_report_removed(changes.removed)
+            name = f"{DOMAIN} dropped task check"
+            entry = self.hass.config_entries.async_get_entry(self.entry_id) if self.entry_id else None
+            if entry is not None:
+                entry.async_create_background_task(self.hass, report, name)
+            else:
+                self.hass.async_create_background_task(report, name)
+
+        _LOGGER.debug(
+            "Task changes - added: %d, changed: %d, completed: %d, dropped: %d, became due: %d",
+            len(changes.added), len(changes.changed), len(changes.completed),
+            len(changes.removed), len(changes.became_due),
+        )
+
+    async def _async_report_removed(self, dropped: List[Dict[str, Any]]) -> None:
+        """Fire events for tasks that dropped out of the task list."""
+        try:
+            completed, removed = await self._async_classify_removed(dropped)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Could not check %d dropped Tududi tasks: %s", len(dropped), err)
+            return
+
+        for task in completed:
+            self.hass.bus.async_fire(
+                EVENT_TASK_COMPLETED, {"entry_id": self.entry_id, **task_snapshot(task)}
+            )
+        for snapshot in removed:
+            self.hass.bus.async_fire(
+                EVENT_TASK_REMOVED, {"entry_id": self.entry_id, **snapshot}
+            )
+
+    async def _async_classify_removed(
+        self, dropped: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Work out why tasks dropped out of the task list.
+
+        Completed tasks are filtered out of the list, so each missing task
+        is looked up. Returns the done tasks and the snapshots of tasks that
+        no longer exist. Tasks that merely left the due-date window, or
+        couldn't be looked up, are in neither.
+        """
+        semaphore = asyncio.Semaphore(TASKS_PAGE_CONCURRENCY)
+
+        async def lookup(snapshot: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            """Return the task details, {} if deleted and None if unknown."""
+            async with semaphore:
+                try:
+                    return await self.client.async_get_task(snapshot["task_id"])
+                except TududiApiError as err:
+                    return {} if err.status == 404 else None
+                except Exception:  # pylint: disable=broad-except
+                    return None
+
+        details = await asyncio.gather(*(lookup(snapshot) for snapshot in dropped))
+        completed = []
+        removed = []
+        for snapshot, detail in zip(dropped, details):
+            if detail == {}:
+                removed.append(snapshot)
+            elif detail and detail.get("status") == TASK_STATUS_DONE:
+                completed.append(detail)
+        return completed, removed
+
+    async def _async_attach_details(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in heavy fields for the displayed tasks.
+
+        Only needed when the list was fetched with lightweight fields.
+        """
+        if not self.filter_support.get(TASK_FILTER_FIELDS):
+            return result
+
+        next_todo = result["next_todo"]
+        upcoming = result.get("upcoming_todos", [])
+        # The next todo is usually also the first upcoming one
+        displayed = {task.get("id"): task for task in [next_todo, *upcoming] if task}
+        details = dict(zip(
+            displayed,
+            await asyncio.gather(
+                *(self._async_get_task_detail(task) for task in displayed.values())
+            ),
+        ))
+
+        if next_todo:
+            result["next_todo"] = details[next_todo.get("id")]
+        result["upcoming_todos"] = [details[task.get("id")] for task in upcoming]
+        return result
+
+    async def _async_get_task_detail(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a task merged with its full details."""
+        if all(field in task for field in TASK_DETAIL_FIELDS):
+            # Already complete, e.g. a suggested task from the metrics
+            return task
+
+        detail = self.detail_cache.get(task)
+        if detail is None:
+            try:
+                detail = await self.client.async_get_task(task.get("id"))
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Could not fetch details of task %s: %s", task.get("id"), err)
+                return task
+            self.detail_cache.put(task, detail)
+        return {**task, **detail}
+
     async def _process_tududi_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process the fetched Tududi data."""
-        _LOGGER.debug("Processing Tududi API response: %s", data)
-        
         tasks = data.get("tasks", [])
         metrics = data.get("metrics", {})
         
         _LOGGER.debug("Found %d tasks in API response", len(tasks))
         
-        # Find the next upcoming todo
-        next_todo = None
-        upcoming_todos = []
-        today_todos = []
-        
-        now = datetime.now()
-        today_date = now.date()
-        
-        for task in tasks:
-        # Skip completed tasks (status 2 = DONE in Tududi)
-            if task.get("status") == 2:
-                continue
-                
-            task_due_date = task.get("due_date")
-            task_name = task.get("name", "Unnamed Task")
-            task_priority = task.get("priority", 0)
-            
-            # Parse due date if available
-            due_date = None
-            if task_due_date:
-                try:
-                    due_date = datetime.fromisoformat(task_due_date.replace('Z', '+00:00')).date()
-                except ValueError:
-                    try:
-                        due_date = datetime.strptime(task_due_date, "%Y-%m-%d").date()
-                    except ValueError:
-                        _LOGGER.warning("Could not parse due date: %s", task_due_date)
-            
-            # Categorize tasks
-            if due_date == today_date or task.get("today", False):
-                today_todos.append(task)
-            elif due_date and due_date > today_date:
-                upcoming_todos.append(task)
-            elif not due_date:  # Tasks without due date
-                upcoming_todos.append(task)
-        
-        # Sort upcoming todos by due date and priority
-        upcoming_todos.sort(key=lambda x: (
-            datetime.fromisoformat(x.get("due_date", "9999-12-31").replace('Z', '+00:00')).date() 
-            if x.get("due_date") else datetime(9999, 12, 31).date(),
-            -x.get("priority", 0)  # Higher priority first (negative for reverse sort)
-        ))
-        
-        # Sort today todos by priority
-        today_todos.sort(key=lambda x: -x.get("priority", 0))
-        
-        # Get the next todo (today todos take precedence)
-        if today_todos:
-            next_todo = today_todos[0]
-        elif upcoming_todos:
-            next_todo = upcoming_todos[0]
+        today_date = datetime.now().date()
+        self._processed_date = today_date
         
-        # Also check suggested tasks from metrics
-        suggested_tasks = metrics.get("suggested_tasks", [])
-        if not next_todo and suggested_tasks:
-            # Filter out completed suggested tasks
-            active_suggested = [t for t in suggested_tasks if t.get("status") != 2]
-            if active_suggested:
-                next_todo = active_suggested[0]
-        
-        result = {
-            "next_todo": next_todo,
-            "upcoming_todos_count": len(upcoming_todos),
-            "today_todos_count": len(today_todos),
-            "all_tasks": tasks,
-            "metrics": metrics,
-        }
+        # Small payloads are cheap enough to process inline, larger ones are
+        # moved off the event loop so big accounts can't stall it
+        if len(tasks) > self.executor_threshold:
+            result = await self.hass.async_add_executor_job(
+                process_tasks, tasks, metrics, today_date
+            )
+        else:
+            result = process_tasks(tasks, metrics, today_date)
         
+        next_todo = result["next_todo"]
         _LOGGER.debug("Processed data - Next todo: %s, Upcoming: %d, Today: %d", 
                      next_todo.get("name") if next_todo else None,
-                     len(upcoming_todos), len(today_todos))
+                     result["upcoming_todos_count"], result["today_todos_count"])
         
         return result
 
@@ -268,8 +499,15 @@ async def async_setup_entry(
     password = config_entry.data.get(CONF_PASSWORD)
     
     coordinator = TududiDataUpdateCoordinator(
-        hass, base_url, username, password
+        hass, base_url, username, password,
+        executor_threshold=config_entry.data.get(
+            CONF_EXECUTOR_THRESHOLD, PROCESSING_EXECUTOR_THRESHOLD
+        ),
+        capabilities=config_entry.data.get(CONF_CAPABILITIES),
+        entry_id=config_entry.entry_id,
     )
+    # Registry of running coordinators, used by the profile service
+    hass.data.setdefault(DOMAIN + "_coordinators", {})[config_entry.entry_id] = coordinator
     
     # Try to fetch initial data, but don't fail if it doesn't work
     try:
@@ -363,6 +601,18 @@ class TududiSensor(CoordinatorEntity, SensorEntity):
                     "updated_at": next_todo.get("updated_at"),
                 })
         
+        elif self.entity_description.key == "upcoming_todos_count":
+            attributes["upcoming_todos"] = [
+                {
+                    "task_id": task.get("id"),
+                    "name": task.get("name", "Unnamed Task"),
+                    "due_date": task.get("due_date"),
+                    "priority": task.get("priority", 0),
+                    "project": task.get("Project", {}).get("name") if task.get("Project") else None,
+                }
+                for task in self.coordinator.data.get("upcoming_todos", [])
+            ]
+        
         # Add metrics data for all sensors
         metrics = self.coordinator.data.get("metrics", {})
         if metrics:
@@ -3,37 +3,73 @@ Installation verification script for Tududi HACS integration.
 
 This script helps verify that the integration files are properly installed
 and can be imported without errors.
+
+Run with --doctor to also benchmark each configured Tududi server (DNS,
+connect, TLS, login and task fetch timings, payload size and task counts)
+and get recommendations for slow sensors. Only the standard library is
+used, so it works outside Home Assistant's environment.
 """
 
+import argparse
+import gzip
+import json
+import socket
+import ssl
 import sys
-import os
+import time
+import zlib
+from http.cookiejar import CookieJar
 from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlparse
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+# Mirrors custom_components/tududi_integration/const.py, which can't be
+# imported without Home Assistant
+DOMAIN = "tududi_integration"
+SENSOR_UPDATE_INTERVAL = 300
+SENSOR_TIMEOUT = 30
+HEARTBEAT_INTERVAL = 60
+FULL_SYNC_INTERVAL = 3600
+PROCESSING_EXECUTOR_THRESHOLD = 500
+TASK_STATUS_DONE = 2
+
+# Thresholds above which the doctor suggests a fix
+SLOW_DNS_MS = 100
+SLOW_CONNECT_MS = 100
+SLOW_TLS_MS = 300
+SLOW_LOGIN_MS = 1000
+LARGE_PAYLOAD_BYTES = 256 * 1024
+# Refreshes longer than this share of the poll interval are worth shrinking
+MAX_REFRESH_SHARE = 0.05
 
-def verify_installation():
+
+def verify_installation(config_dir=None):
     """Verify that all required files are present and valid."""
-    
+
     print("🔍 Verifying Tududi HACS installation...")
     print("=" * 50)
-    
+
     # Check if we're in the right directory
-    current_dir = Path.cwd()
-    if not (current_dir / "custom_components" / "tududi_hacs").exists():
+    current_dir = Path(config_dir) if config_dir else Path.cwd()
+    if not (current_dir / "custom_components" / DOMAIN).exists():
         print("❌ Error: This script must be run from the Home Assistant config directory")
-        print("   Expected to find: custom_components/tududi_hacs/")
+        print(f"   Expected to find: custom_components/{DOMAIN}/")
         return False
-    
-    integration_dir = current_dir / "custom_components" / "tududi_hacs"
-    
+
+    integration_dir = current_dir / "custom_components" / DOMAIN
+
     # Check required files
     required_files = [
         "__init__.py",
-        "manifest.json", 
+        "manifest.json",
         "config_flow.py",
         "const.py",
         "sensor.py",
+        "api.py",
         "strings.json"
     ]
-    
+
     missing_files = []
     for file in required_files:
         file_path = integration_dir / file
@@ -42,15 +78,15 @@ def verify_installation():
         else:
             print(f"❌ {file} - Missing!")
             missing_files.append(file)
-    
+
     if missing_files:
         print(f"\n❌ Installation incomplete. Missing files: {missing_files}")
         return False
-    
+
     # Test syntax of Python files
     print("\n🔍 Checking Python syntax...")
-    python_files = ["__init__.py", "config_flow.py", "const.py", "sensor.py"]
-    
+    python_files = sorted(path.name for path in integration_dir.glob("*.py"))
+
     for py_file in python_files:
         try:
             file_path = integration_dir / py_file
@@ -62,14 +98,13 @@ def verify_installation():
             return False
         except Exception as e:
             print(f"⚠️  {py_file} - Warning: {e}")
-    
+
     # Check manifest.json
     print("\n🔍 Checking manifest.json...")
     try:
-        import json
         with open(integration_dir / "manifest.json", 'r', encoding='utf-8') as f:
             manifest = json.load(f)
-        
+
         required_keys = ["domain", "name", "version", "requirements"]
         for key in required_keys:
             if key in manifest:
@@ -77,11 +112,11 @@ def verify_installation():
             else:
                 print(f"❌ manifest.{key} - Missing!")
                 return False
-                
+
     except json.JSONDecodeError as e:
         print(f"❌ manifest.json - Invalid JSON: {e}")
         return False
-    
+
     print("\n🎉 Installation verification completed successfully!")
     print("\nNext steps:")
     print("1. Restart Home Assistant")
@@ -89,9 +124,450 @@ def verify_installation():
     print("3. Search for 'Tududi HACS'")
     print("4. Configure with your Tududi server URL")
     print("5. Optionally add username/password for todo sensors")
-    
+
     return True
 
+
+def load_config_entries(config_dir):
+    """Return the Tududi config entries stored by Home Assistant."""
+    storage_file = Path(config_dir) / ".storage" / "core.config_entries"
+    if not storage_file.exists():
+        return []
+    with open(storage_file, 'r', encoding='utf-8') as f:
+        storage = json.load(f)
+    return [
+        entry for entry in storage.get("data", {}).get("entries", [])
+        if entry.get("domain") == DOMAIN
+    ]
+
+
+def _ms(start):
+    """Return the milliseconds elapsed since start."""
+    return round((time.monotonic() - start) * 1000, 1)
+
+
+def _decode_body(body, encoding):
+    """Decompress a response body by its Content-Encoding."""
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Raw deflate stream without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def _extract_tasks(data):
+    """Return the task list from an /api/tasks response."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get("tasks", [])
+    return []
+
+
+def measure_connection(url, timeout):
+    """Time DNS resolution, TCP connect and the TLS handshake."""
+    parsed = urlparse(url)
+    host = parsed.hostname
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    result = {"host": host, "port": port, "tls": parsed.scheme == "https"}
+
+    start = time.monotonic()
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    result["dns_ms"] = _ms(start)
+    result["address"] = addresses[0][4][0]
+
+    start = time.monotonic()
+    sock = socket.create_connection(addresses[0][4][:2], timeout=timeout)
+    result["connect_ms"] = _ms(start)
+
+    try:
+        if result["tls"]:
+            context = ssl.create_default_context()
+            start = time.monotonic()
+            try:
+                sock = context.wrap_socket(sock, server_hostname=host)
+            except ssl.SSLCertVerificationError as e:
+                # Time an unverified handshake so the benchmark can go on
+                result["certificate_error"] = str(e)
+                sock.close()
+                sock = socket.create_connection(addresses[0][4][:2], timeout=timeout)
+                context = ssl._create_unverified_context()
+                start = time.monotonic()
+                sock = context.wrap_socket(sock, server_hostname=host)
+            result["tls_ms"] = _ms(start)
+            result["tls_version"] = sock.version()
+    finally:
+        sock.close()
+    return result
+
+
+class TududiBenchmark:
+    """Time requests against a Tududi server with the standard library."""
+
+    def __init__(self, base_url, timeout):
+        """Initialize the benchmark client."""
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._opener = build_opener(HTTPCookieProcessor(CookieJar()))
+
+    def request(self, path, params=None, data=None, headers=None):
+        """Send a request and return the status, headers, raw body and timings."""
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        request_headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "X-Requested-With": "XMLHttpRequest",
+        }
+        request_headers.update(headers or {})
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            request_headers["Content-Type"] = "application/json"
+
+        start = time.monotonic()
+        try:
+            response = self._opener.open(
+                Request(url, data=body, headers=request_headers), timeout=self.timeout
+            )
+        except HTTPError as e:
+            # 304 and error statuses are still timed and reported
+            response = e
+        first_byte_ms = _ms(start)
+        with response:
+            raw = response.read()
+        return {
+            "status": response.getcode(),
+            "headers": response.headers,
+            "body": raw,
+            "first_byte_ms": first_byte_ms,
+            "total_ms": _ms(start),
+        }
+
+    def login(self, username, password):
+        """Log in and return the timed response."""
+        return self.request(
+            "/api/login", data={"email": username, "password": password}
+        )
+
+    def fetch_tasks(self, params=None, headers=None):
+        """Fetch and decode the task list, adding size and decode timings."""
+        result = self.request("/api/tasks", params=params, headers=headers)
+        result["encoding"] = result["headers"].get("Content-Encoding", "identity")
+        result["wire_bytes"] = len(result["body"])
+        if result["status"] != 200:
+            return result
+        start = time.monotonic()
+        decoded = _decode_body(result["body"], result["encoding"])
+        result["data"] = json.loads(decoded)
+        result["decode_ms"] = _ms(start)
+        result["decoded_bytes"] = len(decoded)
+        result["tasks"] = _extract_tasks(result["data"])
+        return result
+
+
+def diagnose_server(url, username, password, timeout, stored_capabilities):
+    """Benchmark one Tududi server and return the findings."""
+    report = {"url": url, "capabilities": stored_capabilities}
+
+    try:
+        report["connection"] = measure_connection(url, timeout)
+    except (OSError, ValueError) as e:
+        report["error"] = f"Cannot connect: {e}"
+        return report
+
+    if "certificate_error" in report["connection"]:
+        # Never send the password over a connection we can't verify
+        report["error"] = "TLS certificate verification failed, skipped the login and API checks"
+        return report
+
+    client = TududiBenchmark(url, timeout)
+    try:
+        if username and password:
+            login = client.login(username, password)
+            report["login"] = {"status": login["status"], "ms": login["total_ms"]}
+            if login["status"] != 200:
+                report["error"] = f"Login failed with status {login['status']}"
+                return report
+        else:
+            report["panel_only"] = True
+            return report
+
+        tasks = client.fetch_tasks()
+        report["tasks"] = {
+            key: tasks.get(key)
+            for key in (
+                "status", "first_byte_ms", "total_ms", "decode_ms",
+                "encoding", "wire_bytes", "decoded_bytes",
+            )
+        }
+        if tasks["status"] != 200:
+            report["error"] = f"/api/tasks returned status {tasks['status']}"
+            return report
+        task_list = tasks["tasks"]
+        report["tasks"]["count"] = len(task_list)
+        report["tasks"]["open"] = sum(
+            1 for task in task_list
+            if isinstance(task, dict) and task.get("status") != TASK_STATUS_DONE
+        )
+
+        # Conditional requests: does the server answer 304 for an unchanged list?
+        validators = {}
+        if tasks["headers"].get("ETag"):
+            validators["If-None-Match"] = tasks["headers"]["ETag"]
+        if tasks["headers"].get("Last-Modified"):
+            validators["If-Modified-Since"] = tasks["headers"]["Last-Modified"]
+        report["conditional"] = False
+        if validators:
+            again = client.request("/api/tasks", headers=validators)
+            report["conditional"] = again["status"] == 304
+            report["conditional_ms"] = again["total_ms"]
+
+        # Pagination: only tells anything if there is more than one task
+        if len(task_list) > 1:
+            page = client.fetch_tasks(params={"limit": "1"})
+            report["pagination"] = (
+                page["status"] == 200 and len(page.get("tasks", [])) <= 1
+            )
+    except (OSError, ValueError, zlib.error) as e:
+        # URLError, timeouts and undecodable responses
+        report["error"] = f"Request failed: {getattr(e, 'reason', e)}"
+    return report
+
+
+def recommend(report):
+    """Return recommendations for a diagnosed server."""
+    tips = []
+    connection = report.get("connection", {})
+    # None when benchmarking a URL that has no config entry
+    stored = report["capabilities"]
+    capabilities = stored or {}
+
+    if connection.get("certificate_error"):
+        tips.append(
+            "The TLS certificate failed verification. Fix the certificate or use "
+            "the server's local http:// address from Home Assistant."
+        )
+    if connection.get("dns_ms", 0) > SLOW_DNS_MS:
+        tips.append(
+            f"DNS lookup took {connection['dns_ms']} ms. Use an IP address or a "
+            "local hostname for the Tududi URL."
+        )
+    if connection.get("connect_ms", 0) > SLOW_CONNECT_MS:
+        tips.append(
+            f"TCP connect took {connection['connect_ms']} ms. If Tududi runs on "
+            "your network, point the integration at its local address instead of "
+            "going through the internet or a tunnel."
+        )
+    if connection.get("tls_ms", 0) > SLOW_TLS_MS:
+        tips.append(
+            f"The TLS handshake took {connection['tls_ms']} ms. A local http:// "
+            "address avoids it on every new connection."
+        )
+    if report.get("login", {}).get("ms", 0) > SLOW_LOGIN_MS:
+        tips.append(
+            f"Login took {report['login']['ms']} ms. The integration logs in "
+            "again whenever its session expires, so this adds to slow refreshes."
+        )
+
+    tasks = report.get("tasks")
+    if not tasks or tasks.get("status") != 200:
+        return tips
+
+    if tasks["encoding"] == "identity" and tasks["wire_bytes"] > LARGE_PAYLOAD_BYTES:
+        tips.append(
+            f"The task list is sent uncompressed ({tasks['wire_bytes'] // 1024} KB). "
+            "Enable gzip for application/json in your reverse proxy "
+            "(nginx: gzip on; gzip_types application/json;)."
+        )
+
+    refresh_seconds = tasks["total_ms"] / 1000
+    poll_interval = HEARTBEAT_INTERVAL if report.get("conditional") else SENSOR_UPDATE_INTERVAL
+    if refresh_seconds > poll_interval * MAX_REFRESH_SHARE:
+        tips.append(
+            f"Downloading the task list takes {refresh_seconds:.1f} s "
+            f"({tasks['decoded_bytes'] // 1024} KB for {tasks['count']} tasks). "
+            "The payload is the bottleneck: compression, a local URL or "
+            "archiving old completed tasks make every refresh faster."
+        )
+
+    # Polling strategy
+    if report.get("conditional"):
+        if capabilities.get("pagination") in ("offset", "cursor"):
+            tips.append(
+                "Conditional requests work, but the task list is paged, so the "
+                f"integration polls every {SENSOR_UPDATE_INTERVAL // 60} minutes "
+                "instead of using two-tier polling."
+            )
+        elif capabilities.get("conditional_requests"):
+            tips.append(
+                "Conditional requests work and two-tier polling is active: a "
+                f"change check every {HEARTBEAT_INTERVAL} s and a full sync at "
+                f"least every {FULL_SYNC_INTERVAL // 60} minutes."
+            )
+        elif stored is None:
+            tips.append(
+                "The server supports conditional requests (ETag/Last-Modified), "
+                "so the integration will use two-tier polling with "
+                f"{HEARTBEAT_INTERVAL} s change checks, unless it splits the task "
+                "list into pages."
+            )
+        else:
+            tips.append(
+                "The server supports conditional requests (ETag/Last-Modified) "
+                "but this entry has not detected it. Open the integration's "
+                "options and save them to enable two-tier polling with "
+                f"{HEARTBEAT_INTERVAL} s change checks."
+            )
+    else:
+        tips.append(
+            "No conditional requests: every poll, every "
+            f"{SENSOR_UPDATE_INTERVAL // 60} minutes, downloads the whole task list. "
+            "A Tududi version or reverse proxy that sends ETag or Last-Modified "
+            "headers enables cheap change checks."
+        )
+
+    filters = capabilities.get("filters") or {}
+    pushed = sorted(name for name, supported in filters.items() if supported)
+    if filters and not pushed:
+        tips.append(
+            "The server ignores the task filters, so completed tasks are "
+            "downloaded and filtered in Home Assistant."
+        )
+    return tips
+
+
+def print_report(title, report, tips):
+    """Print the findings for one server."""
+    print(f"\n🩺 {title} ({report['url']})")
+    print("-" * 50)
+    connection = report.get("connection")
+    if connection:
+        print(f"   DNS lookup:     {connection['dns_ms']} ms ({connection['host']} → {connection['address']})")
+        print(f"   TCP connect:    {connection['connect_ms']} ms (port {connection['port']})")
+        if connection["tls"]:
+            print(f"   TLS handshake:  {connection['tls_ms']} ms ({connection['tls_version']})")
+    if "login" in report:
+        print(f"   Login:          {report['login']['ms']} ms (status {report['login']['status']})")
+    tasks = report.get("tasks")
+    if tasks and tasks.get("status") == 200:
+        print(
+            f"   /api/tasks:     {tasks['total_ms']} ms "
+            f"(first byte {tasks['first_byte_ms']} ms, decode {tasks['decode_ms']} ms)"
+        )
+        print(
+            f"   Payload:        {tasks['wire_bytes']} bytes on the wire "
+            f"({tasks['encoding']}), {tasks['decoded_bytes']} bytes decoded"
+        )
+        print(f"   Tasks:          {tasks['count']} ({tasks['open']} open)")
+        threshold = report.get("executor_threshold", PROCESSING_EXECUTOR_THRESHOLD)
+        where = "outside" if tasks["count"] > threshold else "on"
+        print(f"   Processing:     {where} the event loop (executor threshold {threshold} tasks)")
+        conditional = "yes" if report.get("conditional") else "no"
+        if "conditional_ms" in report:
+            conditional += f" ({report['conditional_ms']} ms)"
+        print(f"   Conditional:    {conditional}")
+        if "pagination" in report:
+            print(f"   Pagination:     {'yes' if report['pagination'] else 'no'}")
+    # Detected by the config flow probe when the entry was set up or saved
+    stored = report.get("capabilities") or {}
+    if "latency_ms" in stored:
+        details = [f"{stored['latency_ms']} ms round trip"]
+        if stored.get("api_version"):
+            details.append(f"Tududi {stored['api_version']}")
+        if stored.get("compression"):
+            details.append(f"{stored['compression']} task list")
+        print(f"   At setup:       {', '.join(details)}")
+    if report.get("panel_only"):
+        print("   Panel only (no credentials), skipped the API checks")
+    if report.get("error"):
+        print(f"❌ {report['error']}")
+
+    if tips:
+        print("\n   Recommendations:")
+        for tip in tips:
+            print(f"   • {tip}")
+
+
+def run_doctor(config_dir, url=None, username=None, password=None, timeout=SENSOR_TIMEOUT):
+    """Benchmark each configured Tududi server and print recommendations."""
+    print("\n🩺 Running Tududi doctor...")
+    print("=" * 50)
+
+    try:
+        entries = load_config_entries(config_dir)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Could not read the config entries: {e}")
+        return False
+
+    if url:
+        # A single server given on the command line, e.g. a local stand-in
+        entries = [{
+            "title": "Command line",
+            "data": {"url": url, "username": username, "password": password},
+        }]
+    elif not entries:
+        print("❌ No Tududi config entries found in .storage/core.config_entries")
+        print("   Run from the Home Assistant config directory or pass --url")
+        return False
+
+    healthy = True
+    for entry in entries:
+        data = entry.get("data", {})
+        if not data.get("url"):
+            print(f"\n⚠️  {entry.get('title', DOMAIN)} has no URL, skipped")
+            continue
+        report = diagnose_server(
+            data["url"],
+            username or data.get("username"),
+            password or data.get("password"),
+            timeout,
+            data.get("capabilities"),
+        )
+        report["executor_threshold"] = data.get(
+            "executor_threshold", PROCESSING_EXECUTOR_THRESHOLD
+        )
+        print_report(entry.get("title") or DOMAIN, report, recommend(report))
+        if report.get("error"):
+            healthy = False
+
+    return healthy
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description="Verify and diagnose the Tududi integration.")
+    parser.add_argument(
+        "--config", default=".", help="Home Assistant config directory (default: current directory)"
+    )
+    parser.add_argument(
+        "--doctor", action="store_true",
+        help="Benchmark the configured Tududi servers and print recommendations",
+    )
+    parser.add_argument(
+        "--url",
+        help="Benchmark only this Tududi URL, with --username and --password, e.g. a local stand-in",
+    )
+    parser.add_argument("--username", help="Override the configured username")
+    parser.add_argument("--password", help="Override the configured password")
+    parser.add_argument(
+        "--timeout", type=float, default=SENSOR_TIMEOUT,
+        help=f"Timeout per request in seconds (default: {SENSOR_TIMEOUT})",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    success = verify_installation()
+    args = parse_args()
+    success = verify_installation(args.config)
+    if args.doctor:
+        # The servers can be diagnosed even if the files need attention
+        success = run_doctor(
+            args.config, args.url, args.username, args.password, args.timeout
+        ) and success
     sys.exit(0 if success else 1)